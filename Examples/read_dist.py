@@ -1,16 +1,16 @@
 import time
 import board
+import busio
 from UltrasonicSensor import UltrasonicSensor
 
-# Prefer board.I2C() since your scan shows the device there; busio.I2C(GPIO32,GPIO33) also works.
-i2c = board.I2C()
+# board.I2C() pins in 400 kHz fast mode; see README "Getting ready" for pull-ups/fallback.
+i2c = busio.I2C(board.GPIO32, board.GPIO33, frequency=400_000)
 
 sensor = UltrasonicSensor(i2c, address=0x34)
 
 while True:
     sensor.takeMeasure()
-    time.sleep(0.12)                 # give the module time to acquire
-    dist_cm = sensor.getDistance()
+    dist_cm = sensor.wait_ready(settle_s=0.12)   # give the module time to acquire
     dur_us  = sensor.getDuration()
-    print(f"Distance: {dist_cm:.1f} cm  |  Echo: {dur_us} us")
+    print(f"Distance: {dist_cm} cm  |  Echo: {dur_us} us")
     time.sleep(0.2)
@@ -14,6 +14,7 @@
 #
 import time
 import board
+import busio
 import analogio
 
 from UltrasonicSensor import UltrasonicSensor
@@ -24,48 +25,72 @@ TEMP_PIN          = board.GPIO26
 TEMP_OFFSET_C     = -2.0        # default calibration offset (°C)
 BASE_TEMP_C       = 20.0        # baseline for compensation
 SETTLE_S          = 0.12        # settle time after triggering a measurement
-AVG_SAMPLES       = 5           # averaging count for smoother output
+AVG_SAMPLES       = 5           # moving-average window for smoother output
+TEMP_SAMPLES      = 8           # ADC samples averaged per temperature reading
 OVERHEAT_WARNING  = 60.0        # warn if measured temp is above this
+PRINT_EVERY       = 5           # print 1 of every N loops (sampling keeps full rate)
+PERIOD_S          = 0.30        # target loop period (one SETTLE_S measurement included)
+
+# Output line, built once instead of on every loop
+FMT = "Temp: {:5.1f}°C (offset {:+.1f}) | Raw: {:6d} cm | Avg: {:6.2f} cm | Comp: {:6.2f} cm"
+WARN_FMT = "Warning: Temperature reads {:.1f}°C — check the micro-switch (should be in TEMP)."
 
 # ---------- Helpers ----------
-def read_temperature_c(adc: analogio.AnalogIn) -> float:
-    """Read temperature sensor on GPIO26 and return Celsius.
-    Formula: tempC = (mV - 500) / 10, where mV = raw * (Vref*1000/65535).
+def read_temperature_c(adc: analogio.AnalogIn, mv_per_count: float, n: int = TEMP_SAMPLES) -> float:
+    """Read temperature sensor on GPIO26 and return Celsius, averaged over n ADC samples.
+    Formula: tempC = (mV - 500) / 10, where mV = raw * mv_per_count.
+    mv_per_count is adc.reference_voltage * 1000 / 65535, computed once by the caller.
     """
-    raw = adc.value
-    mv = raw * (adc.reference_voltage * 1000.0 / 65535.0)
-    temp_c = (mv - 500.0) / 10.0
-    return float(temp_c)
+    s = 0
+    for _ in range(n):
+        s += adc.value
+    return (s / n * mv_per_count - 500.0) * 0.1
 
 # ---------- Setup ----------
-# I2C bus (board.I2C() works on VIDI X; alternatively: busio.I2C(board.GPIO32, board.GPIO33))
-i2c = board.I2C()
+# board.I2C() pins in 400 kHz fast mode; see README "Getting ready" for pull-ups/fallback.
+i2c = busio.I2C(board.GPIO32, board.GPIO33, frequency=400_000)
 
 # Ultrasonic sensor
-us = UltrasonicSensor(i2c, address=I2C_ADDRESS)
+us = UltrasonicSensor(i2c, address=I2C_ADDRESS, avg_window=AVG_SAMPLES)
 
 # On-board temperature sensor
 temp_adc = analogio.AnalogIn(TEMP_PIN)
+MV_PER_COUNT = temp_adc.reference_voltage * 1000.0 / 65535.0   # read Vref once, pass to read_temperature_c
 
 print("Reference voltage (V):", temp_adc.reference_voltage)
 print("Starting measurements… Press Ctrl+C to stop.\n")
 
 # ---------- Loop ----------
+loop_i = 0
+period_ns = int(PERIOD_S * 1_000_000_000)
+next_ns = time.monotonic_ns() + period_ns
 while True:
-    # Read and calibrate temperature
-    temp_c = read_temperature_c(temp_adc) + TEMP_OFFSET_C
+    # Trigger the ultrasonic module first so it measures while we read the ADC
+    us.start_measure(timeout_s=SETTLE_S, settle_s=SETTLE_S)
 
-    # Warn if switch is likely not in TEMP position
-    if temp_c > OVERHEAT_WARNING:
-        print("Warning: Temperature reads {:.1f}°C — check the micro-switch (should be in TEMP).".format(temp_c))
+    # Read and calibrate temperature
+    temp_c = read_temperature_c(temp_adc, MV_PER_COUNT) + TEMP_OFFSET_C
 
-    # Get distance readings
-    raw_cm = us.read_cm_blocking(settle_s=SETTLE_S)
-    avg_cm = us.distance_cm_avg(n=AVG_SAMPLES, settle_s=0.08)
-    comp_cm = us.distance_cm_comp(temp_c, base_temp_c=BASE_TEMP_C, settle_s=SETTLE_S)
+    # One measurement per loop (triggered above; wait_ready() counts from that
+    # trigger, so it only sleeps for whatever settle time is left). The average
+    # and the compensated value reuse it, so the loop fits in PERIOD_S.
+    raw_cm = us.wait_ready(timeout_s=SETTLE_S, settle_s=SETTLE_S)
+    avg_cm = us.moving_avg_add(raw_cm)
+    comp_cm = us.compensate_cm(raw_cm, temp_c, base_temp_c=BASE_TEMP_C)
 
-    # Pretty print one line
-    print("Temp: {:5.1f}°C (offset {:+.1f}) | Raw: {:6.2f} cm | Avg: {:6.2f} cm | Comp: {:6.2f} cm"
-          .format(temp_c, TEMP_OFFSET_C, raw_cm, avg_cm, comp_cm))
+    # Print only every PRINT_EVERY-th loop: serial output is slower than the sensors
+    loop_i += 1
+    if loop_i >= PRINT_EVERY:
+        loop_i = 0
+        # Warn if switch is likely not in TEMP position
+        if temp_c > OVERHEAT_WARNING:
+            print(WARN_FMT.format(temp_c))
+        print(FMT.format(temp_c, TEMP_OFFSET_C, raw_cm, avg_cm, comp_cm))
 
-    time.sleep(0.30)
+    # Sleep only for what is left of the period, so slow measurements don't add to it
+    now_ns = time.monotonic_ns()
+    if next_ns > now_ns:
+        time.sleep((next_ns - now_ns) / 1_000_000_000)
+        next_ns += period_ns
+    else:
+        next_ns = now_ns + period_ns   # overran: restart the schedule instead of bursting
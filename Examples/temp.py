@@ -7,16 +7,19 @@ PinTemp = analogio.AnalogIn(board.GPIO26)
 print(PinTemp.reference_voltage)   # referentna vrijednost 
 print("\n")
 
+# mV po jednom koraku ADC-a, izracunato jednom izvan petlje
+MV_PER_COUNT = PinTemp.reference_voltage * 1000 / 65535
+
 while True:
     temp = PinTemp.value   # ocitana analogna vrijednost
     print("Temperatura: " + str(temp))
     
     # analogna vrijednost pretvorena u milivolte (mV)
-    tempV = temp * (PinTemp.reference_voltage * 1000 / 65535)
+    tempV = temp * MV_PER_COUNT
     print("Temperatura u mV: " + str(tempV))
     
     # mV pretvoreni u stupnjeve Celzijuseve
-    tempC = (tempV - 500) / 10
+    tempC = (tempV - 500) * 0.1
     print("Temperatura u stupnjevima C: " + str(tempC))
     
     time.sleep(0.5)
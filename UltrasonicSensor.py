@@ -20,17 +20,27 @@ Usage
     us = UltrasonicSensor(i2c, address=0x34)
     
     us.takeMeasure()
-    time.sleep(0.12) # give the sensor ~120 ms
-    print(us.getDistance(), "cm", us.getDuration(), "us")
+    d_cm = us.wait_ready(settle_s=0.12) # waits ~120 ms, then reads the distance
+    print(d_cm, "cm", us.getDuration(), "us")
 
 # Stable, blocking reading that returns the first non-zero measurement:
     d_cm = us.read_cm_blocking(settle_s=0.12) # timeout is 0.30 s by default
     print("Blocking:", d_cm, "cm")
 
+# Non-blocking: trigger, do other work, then poll until the result is in:
+    us.start_measure()
+    # ... read other sensors here ...
+    while (d_cm := us.poll()) is None:
+        time.sleep(0.002) # don't hammer the bus between polls
+
 # Averaging for smoother output:
     d_avg = us.distance_cm_avg(n=5, settle_s=0.08)
     print("Average:", d_avg, "cm")
 
+# Moving average: one new trigger per call, mean of the last avg_window readings:
+    d_mov = us.distance_cm_moving_avg()
+    print("Moving average:", d_mov, "cm")
+
 # Air temperature compensation (speed of sound ~ 331.3 + 0.606 * T[°C]):
     # If you already have an IMU, use its thermometer.
     from adafruit_lsm6ds.lsm6dsox import LSM6DSOX
@@ -43,81 +53,216 @@ Usage
 Note:
 The first reading after power-up or configuration change may be 0 — feel free to
 ignore it. If you are working very close (a few cm), increase settle_s to 0.15–0.20 s.
+The module has no "measurement ready" register, and the distance register keeps
+the previous result until a new one is written. So the helpers always wait at
+least settle_s after a trigger before reading; only while the register still
+reads 0 (first measurement after power-up) do they keep polling, every few ms,
+until timeout_s.
 """
 #
 # License: MIT
 
+import array
 import time
 from adafruit_bus_device.i2c_device import I2CDevice
 
+try:
+    from micropython import const
+except ImportError:  # CPython / Blinka
+    def const(x):
+        return x
+
 # Register map (as per MicroPython version)
-TAKE_MEAS_REG = 0x00   # write: send address only to trigger
-DISTANCE_REG  = 0x01   # read: 2 bytes, little-endian, centimeters
-DURATION_REG  = 0x02   # read: 2 bytes, little-endian, microseconds
+TAKE_MEAS_REG = const(0x00)   # write: send address only to trigger
+DISTANCE_REG  = const(0x01)   # read: 2 bytes, little-endian, centimeters
+DURATION_REG  = const(0x02)   # read: 2 bytes, little-endian, microseconds
 
 class UltrasonicSensor:
-    def __init__(self, i2c, address=0x34):
+    def __init__(self, i2c, address=0x34, avg_window=16):
         # Accept either board.I2C() or busio.I2C(...)
         self._device = I2CDevice(i2c, address)
         self.address = address
+        # Ring buffer of the last avg_window distances for distance_cm_moving_avg()
+        if avg_window < 1:
+            raise ValueError("avg_window must be at least 1")
+        self._hist = array.array('H', [0] * avg_window)
+        self._hist_i = 0
+        self._hist_n = 0
+        self._hist_sum = 0
+        # Measurement state for start_measure()/poll(); times in ns because
+        # monotonic() floats lose precision after long uptimes on CircuitPython
+        self._t_trigger = time.monotonic_ns()
+        self._ready_ns = self._t_trigger
+        self._deadline_ns = self._t_trigger
+        self._state = 'idle'
+        # Preallocated command/register bytes and read buffer (no per-call allocs)
+        self._cmd_trigger = bytes([TAKE_MEAS_REG])
+        self._reg_dist = bytes([DISTANCE_REG])
+        self._reg_dur = bytes([DURATION_REG])
+        self._buf2 = bytearray(2)
+        # Cached 1 / v0 for distance_cm_comp (recomputed if base_temp_c changes)
+        self._base_temp_c = None
+        self._v0_inv = None
 
     # --- low-level helpers -------------------------------------------------
-    def _write_cmd_single(self, value):
+    def _write_cmd_single(self, cmd):
         # Single-byte write (no data payload). Matches MicroPython send_address().
+        # cmd is a preallocated 1-byte bytes object, e.g. self._cmd_trigger.
         with self._device as i2c:
-            i2c.write(bytes([value]))
+            i2c.write(cmd)
 
     def _read_into(self, reg, buf):
         # Standard write-then-readinto with repeated START (no STOP in-between).
         # This mirrors typical readfrom_mem semantics used in MicroPython drivers.
+        # reg is a preallocated 1-byte bytes object, e.g. self._reg_dist.
         with self._device as i2c:
-            i2c.write_then_readinto(bytes([reg]), buf)
+            i2c.write_then_readinto(reg, buf)
 
     def _read_u16le(self, reg):
-        b = bytearray(2)
+        # Shift/OR on small ints allocates nothing; unpack_from would build a tuple
+        b = self._buf2
         self._read_into(reg, b)
         return b[0] | (b[1] << 8)
 
+    def _arm(self, timeout_s, settle_s):
+        # Mark a measurement as pending: readable settle_s after the trigger,
+        # expiring timeout_s after it (never before the settle time is over).
+        self._ready_ns = self._t_trigger + int(settle_s * 1_000_000_000)
+        self._deadline_ns = max(self._ready_ns,
+                                self._t_trigger + int(timeout_s * 1_000_000_000))
+        self._state = 'pending'
+
     # --- public API --------------------------------------------------------
     def takeMeasure(self):
         # Trigger a measurement by sending ONLY the register address as a command.
-        self._write_cmd_single(TAKE_MEAS_REG)
+        self._write_cmd_single(self._cmd_trigger)
+        self._t_trigger = time.monotonic_ns()
+
+    def start_measure(self, timeout_s=0.20, settle_s=0.08):
+        # Non-blocking trigger: call poll() until it returns a value. Lets the
+        # caller do other work (e.g. read an ADC) while the module measures.
+        self.takeMeasure()
+        self._arm(timeout_s, settle_s)
+
+    def poll(self):
+        # None while the measurement is pending; otherwise the distance in cm,
+        # or 0 if timeout_s passed without a non-zero reading. Does not touch
+        # the bus before settle_s has passed since the trigger.
+        if self._state != 'pending':
+            raise RuntimeError("poll() called without start_measure()")
+        now = time.monotonic_ns()
+        if now < self._ready_ns:
+            return None
+        d = self.getDistance()
+        if d > 0 or now >= self._deadline_ns:
+            self._state = 'idle'
+            return d
+        return None
+
+    def wait_ready(self, timeout_s=0.20, poll_s=0.002, settle_s=0.08):
+        # There is no status register, and the distance register keeps the last
+        # result, so a non-zero value alone does not mean a *new* measurement.
+        # Always sleep settle_s (counted from the last takeMeasure()) first; then
+        # poll every poll_s while the register still reads 0 (first measurement
+        # after power-up), returning 0 once timeout_s has passed.
+        self._arm(timeout_s, settle_s)
+        wait_ns = self._ready_ns - time.monotonic_ns()
+        if wait_ns > 0:
+            time.sleep(wait_ns / 1_000_000_000)
+        while (d := self.poll()) is None:
+            time.sleep(poll_s)
+        return d
 
     def getDistance(self):
-        # Returns centimeters as float (compatible with the user's expectations)
-        return float(self._read_u16le(DISTANCE_REG))
+        # Returns centimeters as int (the register value; no float allocation)
+        return self._read_u16le(self._reg_dist)
+
+    def getDistanceCm(self):
+        # Returns centimeters as float, for callers that need a float
+        return float(self._read_u16le(self._reg_dist))
 
     def getDuration(self):
         # Returns echo pulse width in microseconds as int
-        return int(self._read_u16le(DURATION_REG))
+        return self._read_u16le(self._reg_dur)
 
     # --- convenience helpers ----------------------------------------------
     def read_cm_blocking(self, timeout_s=0.30, settle_s=0.12):
         """Okidaj i čekaj do prve nenulte mjere ili do isteka vremena."""
-        end = time.monotonic() + float(timeout_s)
+        end = time.monotonic_ns() + int(timeout_s * 1_000_000_000)
         while True:
             self.takeMeasure()
-            time.sleep(settle_s)
-            d = self.getDistance()
-            if d > 0.0 or time.monotonic() >= end:
-                return float(d)
-
-    def distance_cm_avg(self, n=5, settle_s=0.08):
-        """Vrati prosjek od n nenultih mjerenja."""
-        total = 0.0
+            d = self.wait_ready(timeout_s=settle_s, settle_s=settle_s)
+            if d > 0 or time.monotonic_ns() >= end:
+                return d
+
+    def distance_cm_avg(self, n=5, settle_s=0.08, tol_cm=0.5):
+        """Vrati prosjek do n nenultih mjerenja (odbacuje odstupanja >50 %)."""
+        # Running (Welford) mean/variance. The first 3 valid samples seed the
+        # outlier reference with their median, so one bad echo at the start
+        # cannot lock it in; two bad echoes out of those three still can. After
+        # that, a sample more than 50 % away from the current mean is skipped.
+        # Stops early once at least 3 samples agree to within tol_cm (std. dev.).
+        # With fewer than 3 valid samples it returns their plain mean.
+        mean = 0.0
+        m2 = 0.0
         count = 0
+        seed = []
         for _ in range(int(n)):
             self.takeMeasure()
-            time.sleep(settle_s)
-            d = self.getDistance()
-            if d > 0.0:
-                total += d
+            d = self.wait_ready(timeout_s=settle_s, settle_s=settle_s)
+            if d <= 0:
+                continue
+            if len(seed) < 3:
+                seed.append(d)
+                if len(seed) < 3:
+                    continue
+                ref = sorted(seed)[1]
+                batch = seed
+            else:
+                ref = mean
+                batch = (d,)
+            for x in batch:
+                if abs(x - ref) >= 0.5 * max(ref, 1.0):
+                    continue
                 count += 1
-        return (total / count) if count else 0.0
+                delta = x - mean
+                mean += delta / count
+                m2 += delta * (x - mean)
+            if count >= 3 and m2 / (count - 1) < tol_cm * tol_cm:
+                break
+        if len(seed) < 3:
+            return (sum(seed) / len(seed)) if seed else 0.0
+        return mean
+
+    def moving_avg_add(self, d):
+        """Dodaj mjerenje d (cm) u prozor, vrati prosjek zadnjih avg_window nenultih."""
+        # No bus access: feed it a distance you already read. The ring buffer
+        # keeps a running sum, so the mean is O(1) regardless of the window size.
+        hist = self._hist
+        if d > 0:
+            i = self._hist_i
+            self._hist_sum += d - hist[i]
+            hist[i] = d
+            i += 1
+            self._hist_i = 0 if i == len(hist) else i
+            if self._hist_n < len(hist):
+                self._hist_n += 1
+        return (self._hist_sum / self._hist_n) if self._hist_n else 0.0
+
+    def distance_cm_moving_avg(self, timeout_s=0.20, settle_s=0.08):
+        """Jedno novo mjerenje, vrati prosjek zadnjih avg_window nenultih mjerenja."""
+        self.takeMeasure()
+        return self.moving_avg_add(self.wait_ready(timeout_s=timeout_s, settle_s=settle_s))
+
+    def compensate_cm(self, d, temp_c, base_temp_c=20.0):
+        """Kompenziraj već izmjerenu udaljenost d (cm) za temperaturu zraka."""
+        # No bus access: speed of sound ~ 331.3 + 0.606 * T[°C]
+        if base_temp_c != self._base_temp_c:
+            self._v0_inv = 1.0 / (331.3 + 0.606 * base_temp_c)
+            self._base_temp_c = base_temp_c
+        return d * (331.3 + 0.606 * temp_c) * self._v0_inv
 
     def distance_cm_comp(self, temp_c, base_temp_c=20.0, settle_s=0.12):
         """Temperaturna kompenzacija na osnovu brzine zvuka ~ 331.3 + 0.606 * T[°C]."""
-        v  = 331.3 + 0.606 * float(temp_c)
-        v0 = 331.3 + 0.606 * float(base_temp_c)
-        d  = self.read_cm_blocking(settle_s=settle_s)
-        return d * (v / v0)
+        d = self.read_cm_blocking(settle_s=settle_s)
+        return self.compensate_cm(d, temp_c, base_temp_c)